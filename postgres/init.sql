@@ -28,6 +28,41 @@ CREATE INDEX IF NOT EXISTS idx_jobs_job_id ON processing_jobs(job_id);
 CREATE INDEX IF NOT EXISTS idx_jobs_status ON processing_jobs(status);
 CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON processing_jobs(created_at DESC);
 
+-- Aggregate job counts per status, maintained by trigger so /api/stats
+-- reads a handful of counter rows instead of scanning processing_jobs
+CREATE TABLE IF NOT EXISTS stats_counters (
+    status VARCHAR(50) PRIMARY KEY,
+    n BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION update_stats_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stats_counters (status, n) VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET n = stats_counters.n + 1;
+    ELSIF TG_OP = 'UPDATE' AND NEW.status IS DISTINCT FROM OLD.status THEN
+        UPDATE stats_counters SET n = n - 1 WHERE status = OLD.status;
+        INSERT INTO stats_counters (status, n) VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET n = stats_counters.n + 1;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE stats_counters SET n = n - 1 WHERE status = OLD.status;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS processing_jobs_stats ON processing_jobs;
+CREATE TRIGGER processing_jobs_stats
+    AFTER INSERT OR UPDATE OR DELETE ON processing_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_stats_counters();
+
+-- Seed counters from any rows that predate the trigger
+INSERT INTO stats_counters (status, n)
+SELECT status, count(*) FROM processing_jobs GROUP BY status
+ON CONFLICT (status) DO NOTHING;
+
 -- Roles table
 CREATE TABLE IF NOT EXISTS roles (
     id SERIAL PRIMARY KEY,
@@ -0,0 +1,47 @@
+import os
+import logging
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8081')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2 * multiprocessing.cpu_count()))
+worker_class = 'gevent'
+worker_connections = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def on_starting(server):
+    """One-time service startup in the master, before workers fork.
+
+    Uses direct short-lived connections (not the app's pool) so no database
+    sockets are inherited across fork.
+    """
+    from import_housing_data import get_db_connection, create_table_if_not_exists, import_csv_data
+
+    conn = get_db_connection()
+    if conn:
+        logger.info("Connected to PostgreSQL")
+        create_table_if_not_exists(conn)
+        conn.close()
+    else:
+        logger.warning("PostgreSQL connection failed")
+
+    # Auto-import housing data on startup
+    try:
+        csv_file = 'housing_data.csv'
+        if os.path.exists(csv_file):
+            logger.info(f"Attempting to import {csv_file} on startup...")
+            if import_csv_data(csv_file):
+                logger.info("Startup data import completed successfully")
+            else:
+                logger.error("Startup data import failed")
+        else:
+            logger.warning(f"{csv_file} not found, skipping startup import")
+    except Exception as e:
+        logger.error(f"Error during startup data import: {e}")
+
+
+def post_fork(server, worker):
+    # Make psycopg2 waits yield to the gevent hub inside each worker
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
@@ -1,9 +1,11 @@
+import io
 import os
-import csv
 import logging
+import multiprocessing
+from contextlib import contextmanager
 from datetime import datetime
 import psycopg2
-from psycopg2.extras import execute_values
+from psycopg2 import extensions
 
 # Configure logging
 logging.basicConfig(
@@ -24,8 +26,15 @@ def get_db_connection():
         logger.error(f"Database connection failed: {e}")
         return None
 
+# Set once the DDL has run so repeated imports skip the no-op
+# CREATE TABLE round-trip and its catalog lock
+_schema_ready = False
+
 def create_table_if_not_exists(conn):
     """Create housing_price_index table if it doesn't exist"""
+    global _schema_ready
+    if _schema_ready:
+        return
     try:
         cursor = conn.cursor()
         cursor.execute("""
@@ -39,65 +48,186 @@ def create_table_if_not_exists(conn):
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 UNIQUE(tarih, istanbul_turkiye, yeni_yeni_olmayan_konut)
             );
-            
+
             CREATE INDEX IF NOT EXISTS idx_housing_tarih ON housing_price_index(tarih);
             CREATE INDEX IF NOT EXISTS idx_housing_location ON housing_price_index(istanbul_turkiye);
+            CREATE INDEX IF NOT EXISTS idx_housing_keyset ON housing_price_index(tarih DESC, istanbul_turkiye, yeni_yeni_olmayan_konut);
+
+            CREATE UNLOGGED TABLE IF NOT EXISTS housing_staging (
+                tarih DATE NOT NULL,
+                istanbul_turkiye VARCHAR(50) NOT NULL,
+                yeni_yeni_olmayan_konut VARCHAR(50) NOT NULL,
+                fiyat_endeksi DECIMAL(10, 2) NOT NULL
+            );
         """)
         conn.commit()
         cursor.close()
+        _schema_ready = True
         logger.info("Table housing_price_index created or already exists")
     except Exception as e:
         logger.error(f"Error creating table: {e}")
         conn.rollback()
         raise
 
-def import_csv_data(csv_file_path):
-    """Import CSV data into PostgreSQL with duplicate prevention"""
+@contextmanager
+def _suspend_green_wait():
+    """Temporarily clear any registered wait callback around a COPY.
+
+    psycopg2 refuses copy_expert when a green wait callback is active (as
+    psycogreen registers under the gunicorn gevent workers). The blocking
+    COPY never yields, so nothing else can run in the event loop during the
+    suspension window anyway.
+    """
+    callback = extensions.get_wait_callback()
+    if callback is None:
+        yield
+        return
+    extensions.set_wait_callback(None)
+    try:
+        yield
+    finally:
+        extensions.set_wait_callback(callback)
+
+STAGING_COPY_SQL = """
+    COPY housing_staging (tarih, istanbul_turkiye, yeni_yeni_olmayan_konut, fiyat_endeksi)
+    FROM STDIN WITH CSV{header}
+"""
+
+# DISTINCT ON keeps one row per key when the CSV itself contains duplicates.
+# ctid DESC makes the last occurrence in the file win for a serial import
+# (one COPY fills pages in file order); across parallel chunks, which
+# occurrence wins is arbitrary.
+STAGING_MERGE_SQL = """
+    INSERT INTO housing_price_index
+    (tarih, istanbul_turkiye, yeni_yeni_olmayan_konut, fiyat_endeksi)
+    SELECT DISTINCT ON (tarih, istanbul_turkiye, yeni_yeni_olmayan_konut)
+           tarih, istanbul_turkiye, yeni_yeni_olmayan_konut, fiyat_endeksi
+    FROM housing_staging
+    ORDER BY tarih, istanbul_turkiye, yeni_yeni_olmayan_konut, ctid DESC
+    ON CONFLICT (tarih, istanbul_turkiye, yeni_yeni_olmayan_konut)
+    DO UPDATE SET
+        fiyat_endeksi = EXCLUDED.fiyat_endeksi,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+def copy_csv_to_housing_table(cursor, csvfile):
+    """Stream CSV data into housing_price_index via COPY with duplicate prevention.
+
+    COPY streams the raw CSV into the persistent UNLOGGED housing_staging
+    table (no WAL per staged row) so PostgreSQL parses rows server-side,
+    then a single INSERT ... ON CONFLICT merges the staged rows into
+    housing_price_index. Returns (rows_copied, rows_affected).
+    """
+    # TRUNCATE clears any rows left by a failed import and its lock
+    # serializes concurrent imports for the rest of the transaction
+    cursor.execute("TRUNCATE housing_staging")
+
+    with _suspend_green_wait():
+        cursor.copy_expert(STAGING_COPY_SQL.format(header=' HEADER'), csvfile)
+    rows_copied = cursor.rowcount
+
+    cursor.execute(STAGING_MERGE_SQL)
+    rows_affected = cursor.rowcount
+
+    return rows_copied, rows_affected
+
+class _ByteRangeReader:
+    """File-like wrapper exposing only the slice up to `end` to copy_expert"""
+    def __init__(self, f, end):
+        self.f = f
+        self.end = end
+
+    def read(self, size=-1):
+        remaining = self.end - self.f.tell()
+        if remaining <= 0:
+            return b''
+        if size < 0 or size > remaining:
+            size = remaining
+        return self.f.read(size)
+
+def _copy_byte_range(csv_file_path, start, end, with_header):
+    """COPY one byte range of the CSV into housing_staging (worker process)"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError("Worker failed to connect to database")
+    try:
+        cursor = conn.cursor()
+        with open(csv_file_path, 'rb') as f:
+            f.seek(start)
+            with _suspend_green_wait():
+                cursor.copy_expert(
+                    STAGING_COPY_SQL.format(header=' HEADER' if with_header else ''),
+                    _ByteRangeReader(f, end)
+                )
+        rows_copied = cursor.rowcount
+        conn.commit()
+        cursor.close()
+        return rows_copied
+    finally:
+        conn.close()
+
+def _byte_ranges(csv_file_path, workers):
+    """Split the file into byte ranges aligned to line boundaries"""
+    size = os.path.getsize(csv_file_path)
+    offsets = [size * i // workers for i in range(workers + 1)]
+    with open(csv_file_path, 'rb') as f:
+        for i in range(1, workers):
+            # Advance each split point past the newline it lands inside
+            f.seek(offsets[i] - 1)
+            f.readline()
+            offsets[i] = f.tell()
+    return [(offsets[i], offsets[i + 1]) for i in range(workers)
+            if offsets[i] < offsets[i + 1]]
+
+def import_csv_data(csv_file_path, parallel_workers=1):
+    """Import CSV data into PostgreSQL with duplicate prevention.
+
+    With parallel_workers > 1 the file is split into newline-aligned byte
+    ranges COPYed into housing_staging by worker processes concurrently;
+    the staged rows are then merged in one statement as usual. The parallel
+    path spans multiple transactions, so don't run two imports at once, and
+    when a duplicate key's occurrences span chunks it is unspecified which
+    one wins (the serial default keeps last-occurrence-in-file-wins).
+    """
     conn = get_db_connection()
     if not conn:
         logger.error("Failed to connect to database")
         return False
-    
+
     try:
         # Create table if not exists
         create_table_if_not_exists(conn)
-        
-        # Read CSV file
-        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            csv_reader = csv.DictReader(csvfile)
-            
-            # Prepare data for batch insert
-            data_to_insert = []
-            for row in csv_reader:
-                data_to_insert.append((
-                    row['tarih'],
-                    row['istanbul_turkiye'],
-                    row['yeni_yeni_olmayan_konut'],
-                    float(row['fiyat_endeksi'])
-                ))
-            
-            # Use UPSERT (INSERT ... ON CONFLICT) to prevent duplicates
-            cursor = conn.cursor()
-            
-            insert_query = """
-                INSERT INTO housing_price_index 
-                (tarih, istanbul_turkiye, yeni_yeni_olmayan_konut, fiyat_endeksi)
-                VALUES %s
-                ON CONFLICT (tarih, istanbul_turkiye, yeni_yeni_olmayan_konut) 
-                DO UPDATE SET 
-                    fiyat_endeksi = EXCLUDED.fiyat_endeksi,
-                    updated_at = CURRENT_TIMESTAMP
-            """
-            
-            execute_values(cursor, insert_query, data_to_insert)
+
+        cursor = conn.cursor()
+        if parallel_workers > 1:
+            # The parallel path commits the TRUNCATE up front so worker
+            # transactions aren't blocked behind its lock
+            cursor.execute("TRUNCATE housing_staging")
+            conn.commit()
+
+            ranges = _byte_ranges(csv_file_path, parallel_workers)
+            with multiprocessing.Pool(len(ranges)) as pool:
+                counts = pool.starmap(_copy_byte_range, [
+                    (csv_file_path, start, end, i == 0)
+                    for i, (start, end) in enumerate(ranges)
+                ])
+            rows_copied = sum(counts)
+
+            cursor.execute(STAGING_MERGE_SQL)
+            rows_affected = cursor.rowcount
             conn.commit()
-            
-            logger.info(f"Successfully imported {len(data_to_insert)} rows")
-            logger.info(f"Rows affected: {cursor.rowcount}")
-            
-            cursor.close()
-            return True
-            
+        else:
+            # Stream CSV file directly to PostgreSQL via COPY
+            with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
+                rows_copied, rows_affected = copy_csv_to_housing_table(cursor, csvfile)
+                conn.commit()
+
+        logger.info(f"Successfully imported {rows_copied} rows")
+        logger.info(f"Rows affected: {rows_affected}")
+
+        cursor.close()
+        return True
+
     except Exception as e:
         logger.error(f"Error importing data: {e}")
         conn.rollback()
@@ -111,47 +241,22 @@ def import_csv_string(csv_string):
     if not conn:
         logger.error("Failed to connect to database")
         return False
-    
+
     try:
         # Create table if not exists
         create_table_if_not_exists(conn)
-        
-        # Parse CSV string
-        csv_lines = csv_string.strip().split('\n')
-        csv_reader = csv.DictReader(csv_lines)
-        
-        # Prepare data for batch insert
-        data_to_insert = []
-        for row in csv_reader:
-            data_to_insert.append((
-                row['tarih'],
-                row['istanbul_turkiye'],
-                row['yeni_yeni_olmayan_konut'],
-                float(row['fiyat_endeksi'])
-            ))
-        
-        # Use UPSERT (INSERT ... ON CONFLICT) to prevent duplicates
+
+        # Stream CSV string to PostgreSQL via COPY
         cursor = conn.cursor()
-        
-        insert_query = """
-            INSERT INTO housing_price_index 
-            (tarih, istanbul_turkiye, yeni_yeni_olmayan_konut, fiyat_endeksi)
-            VALUES %s
-            ON CONFLICT (tarih, istanbul_turkiye, yeni_yeni_olmayan_konut) 
-            DO UPDATE SET 
-                fiyat_endeksi = EXCLUDED.fiyat_endeksi,
-                updated_at = CURRENT_TIMESTAMP
-        """
-        
-        execute_values(cursor, insert_query, data_to_insert)
+        rows_copied, rows_affected = copy_csv_to_housing_table(cursor, io.StringIO(csv_string.strip()))
         conn.commit()
-        
-        logger.info(f"Successfully imported {len(data_to_insert)} rows")
-        logger.info(f"Rows affected: {cursor.rowcount}")
-        
+
+        logger.info(f"Successfully imported {rows_copied} rows")
+        logger.info(f"Rows affected: {rows_affected}")
+
         cursor.close()
         return True
-        
+
     except Exception as e:
         logger.error(f"Error importing data: {e}")
         conn.rollback()
@@ -161,12 +266,13 @@ def import_csv_string(csv_string):
 
 if __name__ == '__main__':
     import sys
-    
+
     if len(sys.argv) > 1:
-        # Import from file
+        # Import from file, optionally with parallel COPY workers
         csv_file = sys.argv[1]
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else 1
         logger.info(f"Importing data from {csv_file}")
-        success = import_csv_data(csv_file)
+        success = import_csv_data(csv_file, parallel_workers=workers)
     else:
         # Example CSV data (can be replaced with actual file path)
         csv_data = """tarih,istanbul_turkiye,yeni_yeni_olmayan_konut,fiyat_endeksi
@@ -194,10 +300,10 @@ if __name__ == '__main__':
 2010-06-01,İstanbul,Yeni Olmayan Konut,37.5
 2010-06-01,Türkiye,Yeni Konut,46.3
 2010-06-01,Türkiye,Yeni Olmayan Konut,46.8"""
-        
+
         logger.info("Importing example CSV data")
         success = import_csv_string(csv_data)
-    
+
     if success:
         logger.info("Data import completed successfully")
     else: